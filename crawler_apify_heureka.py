@@ -1,15 +1,408 @@
 import asyncio
 import re
+import time
+from collections.abc import Awaitable, Callable
 from datetime import datetime
-from urllib.parse import urljoin
+from itertools import islice
+from urllib.parse import parse_qsl, urldefrag, urlencode, urljoin, urlsplit, urlunsplit
 
-from apify import Actor
-from bs4 import BeautifulSoup
-import gc  # For garbage collection
-from playwright.async_api import Page
+import ahocorasick
+import httpx
+from apify import Actor, Event
+from lxml import etree
+from lxml import html as lh
+from pybloom_live import ScalableBloomFilter
+from selectolax.lexbor import LexborHTMLParser
+import simdjson
+from playwright.async_api import Page, Route
 
 # Crawlee SDK (PlaywrightCrawler is in crawlee, not apify)
-from crawlee.crawlers import PlaywrightCrawler, PlaywrightCrawlingContext
+from crawlee import ConcurrencySettings, Request
+from crawlee.browsers import BrowserPool, PlaywrightBrowserPlugin
+from crawlee.crawlers import PlaywrightCrawler, PlaywrightCrawlingContext, PlaywrightPreNavCrawlingContext
+from crawlee.fingerprint_suite import DefaultFingerprintGenerator, HeaderGenerator, HeaderGeneratorOptions
+
+# Nothing we scrape needs rendering - prices and names live in the HTML/JSON-LD
+BLOCKED_RESOURCE_TYPES = {'image', 'font', 'media', 'stylesheet'}
+BLOCKED_HOSTS = ('google-analytics', 'googletagmanager', 'doubleclick', 'hotjar', 'facebook.net')
+
+# URLs taken from the frontier per round of the plain HTTP stage
+HTTP_BATCH_SIZE = 50
+
+# Politeness limits shared by both stages: at most this many requests in flight
+# and ~1 new request every 0.25 s towards Heureka
+MAX_CONCURRENCY = 10
+MAX_TASKS_PER_MINUTE = 240
+
+# Products are pushed to the dataset in batches of this size
+PUSH_BATCH_SIZE = 50
+
+# Query parameters that never change the page content
+TRACKING_PARAMS = {'ref', 'gclid', 'fbclid'}
+
+# Status codes that mean the page no longer exists; any other non-200 answer
+# (Cloudflare blocks, 429 rate limits, 5xx/52x outages) is retried in the browser
+GONE_STATUS_CODES = {404, 410}
+
+# Fetch metadata Chrome sends for a top-level navigation typed into the address bar
+NAVIGATION_FETCH_HEADERS = {
+    'sec-fetch-dest': 'document',
+    'sec-fetch-mode': 'navigate',
+    'sec-fetch-site': 'none',
+    'sec-fetch-user': '?1',
+}
+
+# Markers of a Cloudflare challenge / block page instead of real content
+CHALLENGE_MARKERS = ('Just a moment', 'Access denied', 'Attention Required', 'cf-browser-verification')
+
+# CSS selectors, defined once and shared by the in-browser JS and the lexbor parser
+SEL_JSON_LD = 'script[type="application/ld+json"]'
+SEL_PRODUCT_MARKERS = '.c-product-price__price, .c-offer-list, .c-offers-list'
+SEL_PRODUCT_LINK = 'a.c-product__link'
+SEL_NEXT = 'a.c-pagination__link--next, a.next, .pagination a.next'
+SEL_OFFER_LISTS = '.c-offers-list__container:not(.c-offers-list__container-recommended)'
+
+# Title for the Cloudflare check plus the product/category heuristic
+PAGE_INFO_JS = '''(productSelector) => ({
+    title: document.title,
+    isProduct: document.querySelector(productSelector) !== null,
+})'''
+
+# Utility/non-product domains to ignore
+IGNORE_DOMAINS = [
+    'ucet.heureka.cz',
+    'checkout.heureka.cz',
+    'sluzby.heureka.cz',
+    'napoveda.heureka.cz',
+    'obchody.heureka.cz',
+]
+
+# Collects product links and the next-page link in one DOM pass, resolving and
+# filtering URLs in the browser (only Heureka hosts, minus IGNORE_DOMAINS)
+CATEGORY_JS = '''({baseUrl, ignoreDomains, productSelector, nextSelector}) => {
+    const ignore = new Set(ignoreDomains);
+    const resolve = href => {
+        if (!href) return null;
+        const url = new URL(href, baseUrl);
+        if (!url.hostname.endsWith('.heureka.cz') || ignore.has(url.hostname)) return null;
+        return url.href;
+    };
+    const products = [];
+    for (const a of document.querySelectorAll(productSelector)) {
+        const url = resolve(a.getAttribute('href'));
+        if (url) products.push(url);
+    }
+    const nextBtn = document.querySelector(nextSelector);
+    return {products, next: nextBtn ? resolve(nextBtn.getAttribute('href')) : null};
+}'''
+
+# Only the tags handle_product actually reads. Serializing just these from the
+# browser (instead of page.content()) keeps the HTML we parse in Python small,
+# like a SoupStrainer would, but also saves the full-DOM transfer over CDP.
+PRODUCT_STRAINER_JS = '''(selector) => {
+    const nodes = document.querySelectorAll(selector);
+    return Array.from(nodes, node => node.outerHTML).join('');
+}'''
+
+
+# Offer rows are rendered in the browser only when JSON-LD has no offers
+OFFERS_JS = '''(selector) => Array.from(document.querySelectorAll(selector), node => node.outerHTML).join('')'''
+
+
+def xpath_class(name: str) -> str:
+    """XPath predicate matching elements that have the given CSS class"""
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+# Compiled once; offer rows of the cheapest-offers list are found in a single C-level
+# walk. The promoted "recommended offers" box is skipped - its shop repeats further down.
+XPATH_OFFERS = etree.XPath(
+    f"//*[{xpath_class('c-offers-list__container')} and not({xpath_class('c-offers-list__container-recommended')})]"
+    f"//*[{xpath_class('c-offer')}]"
+)
+# Shop name comes from the logo's alt text ("Logo Alza.cz")
+XPATH_SHOP = etree.XPath(f"string(.//img[{xpath_class('c-offer__shop-logo')}]/@alt)")
+# Price and availability take the first non-blank text node (like next(el.stripped_strings))
+# instead of the string value of the whole element, which concatenates every descendant.
+# Discounted offers show their price in a discount box instead of .c-offer__price.
+XPATH_PRICE = etree.XPath(
+    f"normalize-space(((.//*[{xpath_class('c-offer__price')}]"
+    f" | .//*[{xpath_class('c-discount-price-box__body-content')}]/*[1])//text()[normalize-space()])[1])"
+)
+XPATH_AVAILABILITY = etree.XPath(
+    "normalize-space((.//*[@data-testid='Availability Badge']//text()[normalize-space()])[1])"
+)
+
+
+def parse_offer_list(html: str) -> list[dict]:
+    """Fallback store prices from the offer list markup"""
+    if not html:
+        return []
+
+    store_prices = []
+    seen_stores = set()
+    for offer in XPATH_OFFERS(lh.fromstring(html.encode())):
+        store_name = XPATH_SHOP(offer).removeprefix('Logo ').strip()
+        # "8 590 Kč" -> "8590", the same shape JSON-LD prices have
+        price = re.sub(r'[^\d,.]', '', XPATH_PRICE(offer)).replace(',', '.')
+        if store_name and price and store_name not in seen_stores:
+            seen_stores.add(store_name)
+            store_prices.append({
+                "store": store_name,
+                "price": price,
+                "currency": "CZK",
+                "availability": XPATH_AVAILABILITY(offer)
+            })
+            if len(store_prices) == 5:
+                break
+    return store_prices
+
+
+async def block_resources(route: Route):
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(host in request.url for host in BLOCKED_HOSTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+def canon_url(url: str) -> str:
+    """Dedupe key for a URL: tracking params, fragments and trailing slashes don't make a new page"""
+    parts = urlsplit(url)
+    query = urlencode([
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.startswith('utm_') and key not in TRACKING_PARAMS
+    ])
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ''))
+
+
+def proxy_session_id(host: str) -> str:
+    """Apify proxy session IDs allow only word characters, dots and tildes (max 50)"""
+    return re.sub(r'[^\w.~]', '_', host)[:50]
+
+
+def build_challenge_automaton() -> ahocorasick.Automaton:
+    automaton = ahocorasick.Automaton()
+    for marker in CHALLENGE_MARKERS:
+        automaton.add_word(marker, marker)
+    automaton.make_automaton()
+    return automaton
+
+
+# All markers matched in a single scan, however many get added
+CHALLENGE_AUTOMATON = build_challenge_automaton()
+
+
+class RequestPacer:
+    """Spaces request starts evenly so that at most max_per_minute begin per minute"""
+
+    def __init__(self, max_per_minute: float):
+        self._interval = 60 / max_per_minute
+        self._next_start = 0.0
+
+    async def wait(self):
+        now = time.monotonic()
+        start = max(now, self._next_start)
+        # Reserve the slot before sleeping so concurrent callers queue up behind it
+        self._next_start = start + self._interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+
+def browser_headers(header_generator: HeaderGenerator) -> dict[str, str]:
+    """Chrome-like request headers, so plain HTTP requests don't announce python-httpx"""
+    headers = dict(header_generator.get_specific_headers(browser_type='chrome'))
+    # Let httpx advertise only the encodings it can actually decode (no br/zstd by default)
+    headers.pop('accept-encoding', None)
+    headers['accept-language'] = 'cs-CZ,cs;q=0.9,en;q=0.8'
+    # The generator can shuffle the sec-fetch-* values between keys, which no real
+    # Chrome sends, so pin them to what a top-level navigation looks like
+    headers.update(NAVIGATION_FETCH_HEADERS)
+    return headers
+
+
+def resolve_heureka_url(href: str | None, base_url: str) -> str | None:
+    """Absolute URL for a link, or None unless it points to a Heureka host outside IGNORE_DOMAINS"""
+    if not href:
+        return None
+    url = urljoin(base_url, href)
+    host = urlsplit(url).hostname or ''
+    if not host.endswith('.heureka.cz') or host in IGNORE_DOMAINS:
+        return None
+    return url
+
+
+def parse_category(tree: LexborHTMLParser, base_url: str) -> tuple[list[str], str | None]:
+    """lexbor counterpart of CATEGORY_JS for pages fetched over plain HTTP"""
+    product_links = []
+    for node in tree.css(SEL_PRODUCT_LINK):
+        url = resolve_heureka_url(node.attributes.get('href'), base_url)
+        if url:
+            product_links.append(url)
+
+    next_btn = tree.css_first(SEL_NEXT)
+    next_url = resolve_heureka_url(next_btn.attributes.get('href'), base_url) if next_btn else None
+    return product_links, next_url
+
+
+# crawled_at only needs second precision, so it is formatted at most once a second
+_crawled_at_cache = [0, '']
+
+
+def now_iso() -> str:
+    second = int(time.time())
+    if second != _crawled_at_cache[0]:
+        _crawled_at_cache[0] = second
+        _crawled_at_cache[1] = datetime.fromtimestamp(second).isoformat()
+    return _crawled_at_cache[1]
+
+
+def is_challenge(text: str) -> bool:
+    """Check a page title or the head of an HTML body for Cloudflare block markers"""
+    return next(CHALLENGE_AUTOMATON.iter(text[:2048]), None) is not None
+
+
+class ProductPageTarget:
+    """lxml parser target that keeps only the first JSON-LD script and the product h1.
+
+    Parsing with a target emits events instead of building elements, so memory
+    stays proportional to the text we keep rather than to the document.
+    """
+
+    def __init__(self):
+        self.json_ld = None
+        self.named_title = None  # h1.c-product-info__name
+        self.first_title = None  # any h1, used when the named one is missing
+        self._capture = None
+        self._depth = 0
+        self._chunks = []
+
+    @property
+    def title(self) -> str | None:
+        return self.named_title or self.first_title
+
+    def start(self, tag, attrib):
+        if self._capture is not None:
+            self._depth += 1
+            return
+
+        if tag == 'script' and self.json_ld is None and attrib.get('type') == 'application/ld+json':
+            self._capture = 'json_ld'
+        elif tag == 'h1' and self.named_title is None:
+            self._capture = 'named_title' if 'c-product-info__name' in attrib.get('class', '').split() else 'first_title'
+        else:
+            return
+        self._depth = 0
+        self._chunks = []
+
+    def data(self, data):
+        if self._capture is not None:
+            self._chunks.append(data)
+
+    def end(self, tag):
+        if self._capture is None:
+            return
+        if self._depth:
+            self._depth -= 1
+            return
+
+        text = ''.join(self._chunks)
+        if self._capture == 'json_ld':
+            self.json_ld = text
+        elif getattr(self, self._capture) is None:
+            setattr(self, self._capture, text.strip())
+        self._capture = None
+        self._chunks = []
+
+    def close(self):
+        return self
+
+
+def pick_product_fields(html: str) -> ProductPageTarget:
+    target = ProductPageTarget()
+    if html:
+        # Fed as bytes: lxml refuses str input that carries an XML encoding declaration
+        etree.fromstring(html.encode(), etree.HTMLParser(target=target, recover=True, encoding='utf-8'))
+    return target
+
+
+# Reused across pages so simdjson can keep its internal buffers between parses
+JSON_PARSER = simdjson.Parser()
+
+
+def json_ld_value(value):
+    """Detach a simdjson value from the parser: containers become dict/list, scalars str"""
+    if isinstance(value, simdjson.Object):
+        return value.as_dict()
+    if isinstance(value, simdjson.Array):
+        return value.as_list()
+    return None if value is None else str(value)
+
+
+def parse_product_json_ld(raw: str) -> dict | None:
+    """Read the Product node of Heureka's JSON-LD, touching only the fields we output.
+
+    simdjson documents are only valid until the parser is reused, so everything is
+    converted to plain Python values before returning (and before any await).
+    """
+    doc = JSON_PARSER.parse(raw.encode())
+    # JSON-LD contains @graph array with product data
+    if not isinstance(doc, simdjson.Object) or '@graph' not in doc:
+        return None
+
+    for item in doc['@graph']:
+        if not isinstance(item, simdjson.Object) or item.get('@type') != 'Product':
+            continue
+
+        # Rating
+        rating_value = None
+        review_count = None
+        agg_rating = item.get('aggregateRating')
+        if isinstance(agg_rating, simdjson.Object):
+            rating_value = json_ld_value(agg_rating.get('ratingValue'))
+            review_count = json_ld_value(agg_rating.get('reviewCount'))
+
+        # Prices
+        lowest_price = None
+        highest_price = None
+        store_prices = []
+        offers = item.get('offers')
+        if isinstance(offers, simdjson.Object):
+            lowest_price = json_ld_value(offers.get('lowPrice'))
+            highest_price = json_ld_value(offers.get('highPrice'))
+
+            # Extract individual store offers
+            offer_list = offers.get('offers')
+            if isinstance(offer_list, simdjson.Array):
+                for offer in islice(offer_list, 10):  # Top 10 offers
+                    if not isinstance(offer, simdjson.Object):
+                        continue
+                    seller = offer.get('seller')
+                    store_name = json_ld_value(seller.get('name')) if isinstance(seller, simdjson.Object) else "Unknown"
+                    price = json_ld_value(offer.get('price'))
+                    availability = json_ld_value(offer.get('availability'))
+                    availability = availability.split('/')[-1] if isinstance(availability, str) else ''
+
+                    if price:
+                        store_prices.append({
+                            "store": store_name,
+                            "price": price,
+                            "currency": "CZK",
+                            "availability": availability
+                        })
+
+        return {
+            "title": json_ld_value(item.get('name')),
+            "brand": json_ld_value(item.get('brand')),
+            "rating": rating_value,
+            "review_count": review_count,
+            "lowest_price": lowest_price,
+            "highest_price": highest_price,
+            "store_prices": store_prices,
+        }
+
+    return None
 
 async def main():
     async with Actor:
@@ -46,6 +439,25 @@ async def main():
         # State management for product count
         product_count = 0
 
+        # Canonical URLs already enqueued, checked before touching the request queue
+        seen_urls = ScalableBloomFilter(initial_capacity=100_000, error_rate=0.001)
+
+        def new_urls(urls: list[str]) -> list[str]:
+            """Drop URLs whose canonical form was already enqueued; the rest lose only their fragment"""
+            fresh = []
+            for url in urls:
+                key = canon_url(url)
+                if key not in seen_urls:
+                    seen_urls.add(key)
+                    # Fetch the URL as Heureka links it (trailing slash included) to avoid a redirect
+                    fresh.append(urldefrag(url).url)
+            return fresh
+
+        start_urls = new_urls(start_urls)
+
+        # Products waiting to be written to the dataset in one push_data call
+        product_buffer = []
+
         # Create Proxy Configuration
         # Use residential proxies from Czech Republic for bypassing Cloudflare
         proxy_configuration = None
@@ -71,12 +483,121 @@ async def main():
             Actor.log.warning('Running without proxies. Expect Cloudflare blocking (403 errors).')
             proxy_configuration = None
 
+        # Plain HTTP clients for stage A - Heureka pages are server-rendered, so
+        # most URLs don't need a browser at all.
+        # One client per target host, each pinned to its own proxy session, so
+        # Heureka sees a stable IP (and we keep the TLS connection) across a
+        # category -> product chain.
+        http_clients: dict[str, httpx.AsyncClient] = {}
+        header_generator = HeaderGenerator()
+        # Same limits crawlee enforces for stage B through ConcurrencySettings
+        http_slots = asyncio.Semaphore(MAX_CONCURRENCY)
+        http_pacer = RequestPacer(MAX_TASKS_PER_MINUTE)
+        pages_fetched = 0  # pages successfully handled over plain HTTP
+
+        async def get_http_client(url: str) -> httpx.AsyncClient:
+            host = urlsplit(url).netloc
+            if host not in http_clients:
+                proxy_url = None
+                if proxy_configuration:
+                    proxy_url = await proxy_configuration.new_url(session_id=proxy_session_id(host))
+                # Another handler may have created it while we awaited the proxy URL
+                if host not in http_clients:
+                    http_clients[host] = httpx.AsyncClient(
+                        http2=True,
+                        proxy=proxy_url,
+                        headers=browser_headers(header_generator),
+                        limits=httpx.Limits(max_connections=50),
+                        follow_redirects=True,
+                        timeout=20,
+                    )
+            return http_clients[host]
+
+        async def fetch_html(url: str) -> str | None:
+            """Fetch the page over plain HTTP.
+
+            Returns None when a browser should retry it (network error, Cloudflare
+            block or challenge, rate limit, server error) and '' for pages that are
+            gone (404, 410).
+            """
+            try:
+                http_client = await get_http_client(url)
+                async with http_slots:
+                    await http_pacer.wait()
+                    response = await http_client.get(url)
+            except Exception as e:
+                Actor.log.warning(f'HTTP fetch failed for {url}: {e}')
+                return None
+
+            if response.status_code in GONE_STATUS_CODES:
+                Actor.log.warning(f'Skipping {url}: HTTP {response.status_code}')
+                return ''
+            if response.status_code != 200 or is_challenge(response.text):
+                return None
+            return response.text
+
+        async def crawl_over_http(requests: list[tuple[str, str]]) -> list[tuple[str, str]]:
+            """Stage A: crawl (url, label) pairs with httpx, returning the ones that need a browser"""
+            nonlocal pages_fetched
+            frontier = list(requests)
+            blocked = []
+
+            # Blocked URLs still count against maxPages - the browser will fetch them
+            while frontier and pages_fetched + len(blocked) < max_pages and not products_done():
+                batch_size = min(HTTP_BATCH_SIZE, max_pages - pages_fetched - len(blocked))
+                batch, frontier = frontier[:batch_size], frontier[batch_size:]
+
+                pages = await asyncio.gather(*(fetch_html(url) for url, _ in batch))
+                for (url, label), html in zip(batch, pages):
+                    if html is None:
+                        blocked.append((url, label))
+                        continue
+                    if not html:
+                        pages_fetched += 1
+                        continue
+                    Actor.log.info(f'Processing {url} (HTTP) ...')
+                    try:
+                        discovered = await handle_http_page(url, label, html)
+                    except Exception as e:
+                        # Same isolation crawlee gives stage B: one bad page must not end the run
+                        Actor.log.exception(f'Failed to process {url} over HTTP, retrying it in the browser: {e}')
+                        blocked.append((url, label))
+                        continue
+                    pages_fetched += 1
+                    frontier.extend(discovered)
+
+            if blocked:
+                Actor.log.info(f'{len(blocked)} URLs were blocked over plain HTTP, falling back to Playwright')
+            return blocked
+
+        async def handle_http_page(url: str, label: str, html: str) -> list[tuple[str, str]]:
+            """Extract one page fetched over HTTP; returns newly discovered (url, label) pairs"""
+            if label == 'PRODUCT':
+                await handle_product(url, pick_product_fields(html), html)
+                return []
+
+            tree = LexborHTMLParser(html)
+            if label == 'DETECT' and tree.css_first(SEL_PRODUCT_MARKERS) is not None:
+                await handle_product(url, pick_product_fields(html), html)
+                return []
+
+            Actor.log.info(f'Scraping Category: {url}')
+            product_links, next_url = parse_category(tree, url)
+            product_links = new_urls(product_links)
+            next_urls = new_urls([next_url] if next_url else [])
+            Actor.log.info(f"Found {len(product_links)} product links")
+            if next_urls:
+                Actor.log.info(f"Found pagination link: {next_urls[0]}")
+
+            return [(link, 'PRODUCT') for link in product_links] + [(link, 'CATEGORY') for link in next_urls]
+
+        def products_done() -> bool:
+            return bool(max_products) and product_count >= max_products
+
         # Define the request handler
         async def request_handler(context: PlaywrightCrawlingContext):
-            nonlocal product_count
-            
             # Check product limit
-            if max_products and product_count >= max_products:
+            if products_done():
                 Actor.log.info(f"Reached max products limit ({max_products}). Skipping {context.request.url}")
                 return
 
@@ -84,12 +605,12 @@ async def main():
             request = context.request
             Actor.log.info(f'Processing {request.url} ...')
 
-            # Wait for body to ensure load
-            await page.wait_for_selector('body')
+            # goto() already waited for DOMContentLoaded; read the title and the
+            # page type heuristic in a single round-trip
+            info = await page.evaluate(PAGE_INFO_JS, SEL_PRODUCT_MARKERS)
             
             # Handle Cloudflare/Bot detection (basic check)
-            title = await page.title()
-            if "Just a moment" in title or "Access denied" in title:
+            if is_challenge(info['title']):
                 Actor.log.error(f"Blocked by Cloudflare: {request.url}")
                 # In a real scenario, we might want to retry or rotate session here
                 return
@@ -99,67 +620,42 @@ async def main():
             label = request.user_data.get('label', 'DETECT')
             
             if label == 'DETECT':
-                # Use Playwright evaluation to detect page type - no BeautifulSoup needed
-                is_product = await page.evaluate('''() => {
-                    return document.querySelector('.c-product-price__price') !== null || 
-                           document.querySelector('.c-offer-list') !== null;
-                }''')
-                label = 'PRODUCT' if is_product else 'CATEGORY'
+                # Use Playwright evaluation to detect page type - no HTML parsing needed
+                label = 'PRODUCT' if info['isProduct'] else 'CATEGORY'
             
             # Only parse HTML when we need to extract data
             if label == 'CATEGORY':
                 await handle_category_playwright(context, page)
             elif label == 'PRODUCT':
-                # For products, we still need soup for complex extraction
-                content = await page.content()
-                soup = BeautifulSoup(content, 'lxml')
-                await handle_product(context, soup)
-                soup.decompose()
-                del soup
-                del content
-                gc.collect()
+                # For products we only need two nodes, so stream them out without a tree;
+                # the offer list is only serialized if JSON-LD turns out to have no offers
+                content = await page.evaluate(PRODUCT_STRAINER_JS, f'{SEL_JSON_LD}, h1')
+                await handle_product(
+                    request.url,
+                    pick_product_fields(content),
+                    lambda: page.evaluate(OFFERS_JS, SEL_OFFER_LISTS),
+                )
 
         async def handle_category_playwright(context: PlaywrightCrawlingContext, page: Page):
-            """Handle category pages using Playwright evaluation - no BeautifulSoup"""
+            """Handle category pages using Playwright evaluation - no HTML parsing in Python"""
             request = context.request
             Actor.log.info(f'Scraping Category: {request.url}')
             
-            # Utility/non-product domains to ignore
-            IGNORE_DOMAINS = [
-                'ucet.heureka.cz',
-                'checkout.heureka.cz',
-                'sluzby.heureka.cz',
-                'napoveda.heureka.cz',
-                'obchody.heureka.cz',
-            ]
-            
-            # Extract product links using Playwright evaluation (no DOM parsing in Python)
-            product_links = await page.evaluate('''(baseUrl) => {
-                const links = [];
-                const productElements = document.querySelectorAll('a.c-product__link');
-                productElements.forEach(a => {
-                    const href = a.getAttribute('href');
-                    if (href) {
-                        // Resolve relative URLs
-                        const url = new URL(href, baseUrl).href;
-                        if (url.includes('.heureka.cz')) {
-                            links.push(url);
-                        }
-                    }
-                });
-                return links;
-            }''', request.url)
-            
-            # Filter ignored domains in Python (simpler)
-            filtered_links = [
-                url for url in product_links 
-                if not any(domain in url for domain in IGNORE_DOMAINS)
-            ]
+            # Product links and pagination in a single round-trip; URLs come back
+            # already resolved and filtered, so no post-processing in Python
+            data = await page.evaluate(CATEGORY_JS, {
+                'baseUrl': request.url,
+                'ignoreDomains': IGNORE_DOMAINS,
+                'productSelector': SEL_PRODUCT_LINK,
+                'nextSelector': SEL_NEXT,
+            })
+            product_links = new_urls(data['products'])
+            next_urls = new_urls([data['next']] if data['next'] else [])
             
             # Enqueue in batches
             BATCH_SIZE = 20
-            for i in range(0, len(filtered_links), BATCH_SIZE):
-                batch = filtered_links[i:i+BATCH_SIZE]
+            for i in range(0, len(product_links), BATCH_SIZE):
+                batch = product_links[i:i+BATCH_SIZE]
                 if batch:
                     await context.enqueue_links(
                         urls=batch,
@@ -167,33 +663,30 @@ async def main():
                         strategy='same-domain'
                     )
             
-            Actor.log.info(f"Found {len(filtered_links)} product links")
+            Actor.log.info(f"Found {len(product_links)} product links")
             
             # Check for pagination
-            next_url = await page.evaluate('''() => {
-                const nextBtn = document.querySelector('a.c-pagination__link--next, a.next, .pagination a.next');
-                return nextBtn ? nextBtn.href : null;
-            }''')
-            
-            if next_url and '.heureka.cz' in next_url:
-                if not any(domain in next_url for domain in IGNORE_DOMAINS):
-                    Actor.log.info(f"Found pagination link: {next_url}")
-                    await context.enqueue_links(
-                        urls=[next_url],
-                        label='CATEGORY',
-                        strategy='same-domain'
-                    )
+            if next_urls:
+                Actor.log.info(f"Found pagination link: {next_urls[0]}")
+                await context.enqueue_links(
+                    urls=next_urls,
+                    label='CATEGORY',
+                    strategy='same-domain'
+                )
 
-        async def handle_product(context: PlaywrightCrawlingContext, soup: BeautifulSoup):
+        async def handle_product(
+            url: str,
+            page_fields: ProductPageTarget,
+            offers_html: str | Callable[[], Awaitable[str]],
+        ):
+            """Save one product; offers_html is the page HTML or a loader for the offer list markup"""
             nonlocal product_count
-            if max_products and product_count >= max_products:
+            if products_done():
                 return
 
-            request = context.request
-            Actor.log.info(f'Scraping Product: {request.url}')
+            Actor.log.info(f'Scraping Product: {url}')
             
             # Try to extract from JSON-LD structured data first (most reliable)
-            import json
             title = "Unknown"
             rating_value = None
             review_count = None
@@ -202,57 +695,32 @@ async def main():
             brand = "Unknown"
             store_prices = []
             
-            # Find JSON-LD script tag
-            json_ld = soup.find('script', {'type': 'application/ld+json'})
-            if json_ld:
+            # JSON-LD script picked up while streaming the HTML
+            if page_fields.json_ld:
                 try:
-                    data_json = json.loads(json_ld.string)
-                    # JSON-LD contains @graph array with product data
-                    if isinstance(data_json, dict) and '@graph' in data_json:
-                        for item in data_json['@graph']:
-                            if item.get('@type') == 'Product':
-                                title = item.get('name', title)
-                                brand = item.get('brand', brand)
-                                
-                                # Rating
-                                agg_rating = item.get('aggregateRating', {})
-                                rating_value = agg_rating.get('ratingValue')
-                                review_count = agg_rating.get('reviewCount')
-                                
-                                # Prices
-                                offers = item.get('offers', {})
-                                if isinstance(offers, dict):
-                                    lowest_price = offers.get('lowPrice', lowest_price)
-                                    highest_price = offers.get('highPrice', highest_price)
-                                    
-                                    # Extract individual store offers
-                                    offer_list = offers.get('offers', [])
-                                    for offer in offer_list[:10]:  # Top 10 offers
-                                        if isinstance(offer, dict):
-                                            seller = offer.get('seller', {})
-                                            store_name = seller.get('name') if isinstance(seller, dict) else "Unknown"
-                                            price = offer.get('price')
-                                            availability = offer.get('availability', '').split('/')[-1]
-                                            
-                                            if price:
-                                                store_prices.append({
-                                                    "store": store_name,
-                                                    "price": str(price),
-                                                    "currency": "CZK",
-                                                    "availability": availability
-                                                })
-                                break
+                    product_json = parse_product_json_ld(page_fields.json_ld)
+                    if product_json:
+                        title = product_json['title'] or title
+                        brand = product_json['brand'] or brand
+                        rating_value = product_json['rating']
+                        review_count = product_json['review_count']
+                        lowest_price = product_json['lowest_price'] or lowest_price
+                        highest_price = product_json['highest_price'] or highest_price
+                        store_prices = product_json['store_prices']
                 except Exception as e:
                     Actor.log.warning(f"Failed to parse JSON-LD: {e}")
             
             # Fallback: Try to extract from HTML if JSON-LD failed
-            if title == "Unknown":
-                h1 = soup.select_one('h1.c-product-info__name, h1')
-                if h1:
-                    title = h1.get_text(strip=True)
+            if title == "Unknown" and page_fields.title:
+                title = page_fields.title
+
+            if not store_prices:
+                if callable(offers_html):
+                    offers_html = await offers_html()
+                store_prices = parse_offer_list(offers_html)
 
             data = {
-                "url": request.url,
+                "url": url,
                 "title": title,
                 "brand": brand,
                 "rating": rating_value,
@@ -261,23 +729,88 @@ async def main():
                 "highest_price": highest_price,
                 "currency": "CZK",
                 "store_prices": store_prices,
-                "crawled_at": datetime.now().isoformat()
+                "crawled_at": now_iso()
             }
             
-            await Actor.push_data(data)
+            product_buffer.append(data)
+            if len(product_buffer) >= PUSH_BATCH_SIZE:
+                await flush_products()
             product_count += 1
             Actor.log.info(f"Products fetched: {product_count}/{max_products}")
 
-        # Create the crawler
-        crawler = PlaywrightCrawler(
-            request_handler=request_handler,
-            proxy_configuration=proxy_configuration,
-            max_requests_per_crawl=max_pages,
-            headless=True,
-        )
+        async def flush_products():
+            nonlocal product_buffer
+            # Swap before awaiting so concurrent handlers keep appending to a fresh list
+            batch, product_buffer = product_buffer, []
+            if batch:
+                await Actor.push_data(batch)
+
+        # Don't lose buffered products when the run migrates, aborts or persists state
+        async def flush_on_event(_event_data):
+            await flush_products()
 
-        # Run the crawler
-        await crawler.run(start_urls)
+        for event in (Event.PERSIST_STATE, Event.MIGRATING, Event.ABORTING):
+            Actor.on(event, flush_on_event)
+
+        def create_browser_crawler(max_requests: int) -> PlaywrightCrawler:
+            """Stage B: Playwright crawler for the URLs plain HTTP couldn't get through"""
+            # One long-lived Chromium for the whole run, so browser startup is paid
+            # once. Each page gets its own lightweight incognito context, created with
+            # the proxy of the page's crawlee session - concurrent pages go out through
+            # different residential IPs and session rotation on 403 takes effect.
+            browser_pool = BrowserPool(
+                plugins=[
+                    PlaywrightBrowserPlugin(
+                        browser_type='chromium',
+                        browser_launch_options={
+                            'headless': True,
+                            'args': ['--no-sandbox', '--disable-dev-shm-usage', '--disable-gpu'],
+                        },
+                        # Room for every concurrent page (and its context) in the one browser
+                        max_open_pages_per_browser=MAX_CONCURRENCY,
+                        use_incognito_pages=True,
+                        # Same fingerprints PlaywrightCrawler would use by default
+                        fingerprint_generator=DefaultFingerprintGenerator(
+                            header_options=HeaderGeneratorOptions(browsers=['chromium'])
+                        ),
+                    )
+                ],
+            )
+
+            crawler = PlaywrightCrawler(
+                request_handler=request_handler,
+                proxy_configuration=proxy_configuration,
+                max_requests_per_crawl=max_requests,
+                max_request_retries=1,
+                # Pages are independent and I/O-bound, so keep several in flight
+                concurrency_settings=ConcurrencySettings(
+                    min_concurrency=2,
+                    desired_concurrency=8,
+                    max_concurrency=MAX_CONCURRENCY,
+                    max_tasks_per_minute=MAX_TASKS_PER_MINUTE,
+                ),
+                browser_pool=browser_pool,
+                # Everything we read is in the initial HTML, no need to wait for 'load'
+                goto_options={'wait_until': 'domcontentloaded'},
+            )
+
+            @crawler.pre_navigation_hook
+            async def setup_page(context: PlaywrightPreNavCrawlingContext):
+                # Skip images, fonts, CSS and trackers - saves residential proxy traffic
+                await context.page.route('**/*', block_resources)
+
+            return crawler
+
+        # Run the crawler: plain HTTP first, the browser only for what got blocked
+        try:
+            blocked = await crawl_over_http([(url, 'DETECT') for url in start_urls])
+            if blocked and not products_done():
+                crawler = create_browser_crawler(max_pages - pages_fetched)
+                await crawler.run([Request.from_url(url, label=label) for url, label in blocked])
+        finally:
+            await flush_products()
+            for http_client in http_clients.values():
+                await http_client.aclose()
         
         Actor.log.info('Actor finished.')
 
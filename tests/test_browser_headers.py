@@ -0,0 +1,19 @@
+from crawlee.fingerprint_suite import HeaderGenerator
+
+from crawler_apify_heureka import browser_headers
+
+
+def test_fetch_metadata_matches_a_navigation():
+    headers = browser_headers(HeaderGenerator())
+
+    assert headers['sec-fetch-dest'] == 'document'
+    assert headers['sec-fetch-mode'] == 'navigate'
+    assert headers['sec-fetch-site'] == 'none'
+    assert headers['sec-fetch-user'] == '?1'
+
+
+def test_user_agent_and_encoding():
+    headers = browser_headers(HeaderGenerator())
+
+    assert 'Chrome/' in headers['user-agent']
+    assert 'accept-encoding' not in headers
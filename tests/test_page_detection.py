@@ -0,0 +1,20 @@
+from pathlib import Path
+
+from selectolax.lexbor import LexborHTMLParser
+
+from crawler_apify_heureka import SEL_PRODUCT_MARKERS
+
+SAMPLES = Path(__file__).parent.parent
+
+
+def is_product(sample):
+    tree = LexborHTMLParser((SAMPLES / sample).read_text(encoding='utf-8'))
+    return tree.css_first(SEL_PRODUCT_MARKERS) is not None
+
+
+def test_product_page_is_detected():
+    assert is_product('sample_source_code_product.html')
+
+
+def test_category_page_is_not_a_product():
+    assert not is_product('sample_source_code.html')
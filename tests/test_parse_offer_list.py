@@ -0,0 +1,36 @@
+from pathlib import Path
+
+from crawler_apify_heureka import parse_offer_list
+
+SAMPLE_PRODUCT = Path(__file__).parent.parent / 'sample_source_code_product.html'
+
+
+def test_sample_product_page():
+    store_prices = parse_offer_list(SAMPLE_PRODUCT.read_text(encoding='utf-8'))
+
+    # Cheapest-offers list only; the promoted Allegro.cz box above it is skipped
+    assert [offer['store'] for offer in store_prices] == [
+        'Eldum.cz', 'Allegro.cz', 'iPLUTO.cz', 'suntech.cz', 'T.S.BOHEMIA a.s.',
+    ]
+    # Discounted offer, priced from the discount box
+    assert store_prices[0] == {'store': 'Eldum.cz', 'price': '8590', 'currency': 'CZK', 'availability': 'Skladem'}
+
+
+def test_repeated_shop_is_listed_once():
+    offer = (
+        '<section class="c-offer"><img class="c-offer__shop-logo" alt="Logo {shop}">'
+        '<span class="c-offer__price">{price} Kč</span></section>'
+    )
+    html = (
+        '<div class="c-offers-list__container">'
+        + offer.format(shop='Alza.cz', price='1 000')
+        + offer.format(shop='Alza.cz', price='1 100')
+        + offer.format(shop='Mall.cz', price='1 200')
+        + '</div>'
+    )
+
+    assert [(o['store'], o['price']) for o in parse_offer_list(html)] == [('Alza.cz', '1000'), ('Mall.cz', '1200')]
+
+
+def test_empty():
+    assert parse_offer_list('') == []
@@ -0,0 +1,35 @@
+import json
+
+from crawler_apify_heureka import parse_product_json_ld
+
+
+def product_json_ld(**product):
+    return json.dumps({'@graph': [{'@type': 'Product', **product}]})
+
+
+def test_non_scalar_values_are_detached_from_the_parser():
+    result = parse_product_json_ld(product_json_ld(
+        name={'@value': 'Dyson Wash G1'},
+        brand=[{'@type': 'Brand', 'name': 'Dyson'}],
+        aggregateRating={'ratingValue': 92, 'reviewCount': 10},
+        offers={'lowPrice': 8590, 'offers': [
+            {'seller': {'name': 'Eldum.cz'}, 'price': 8590, 'availability': 'https://schema.org/InStock'},
+        ]},
+    ))
+
+    assert result['title'] == {'@value': 'Dyson Wash G1'}
+    assert result['brand'] == [{'@type': 'Brand', 'name': 'Dyson'}]
+    assert result['rating'] == '92'
+    assert result['lowest_price'] == '8590'
+    assert result['store_prices'] == [
+        {'store': 'Eldum.cz', 'price': '8590', 'currency': 'CZK', 'availability': 'InStock'},
+    ]
+    json.dumps(result)
+
+    # Would raise RuntimeError if any simdjson proxy from the first parse were still alive
+    assert parse_product_json_ld(product_json_ld(name='Dyson V15'))['title'] == 'Dyson V15'
+
+
+def test_missing_product_node():
+    assert parse_product_json_ld(json.dumps({'@graph': [{'@type': 'WebPage'}]})) is None
+    assert parse_product_json_ld('[]') is None
@@ -0,0 +1,19 @@
+from crawler_apify_heureka import pick_product_fields
+
+
+def test_prefers_named_h1_and_keeps_first_json_ld():
+    fields = pick_product_fields(
+        '<h1>Other</h1>'
+        '<script type="application/ld+json">{"a": 1}</script>'
+        '<script type="application/ld+json">{"b": 2}</script>'
+        '<h1 class="c-product-info__name"> Dyson <span>Wash G1</span> </h1>'
+    )
+
+    assert fields.title == 'Dyson Wash G1'
+    assert fields.json_ld == '{"a": 1}'
+
+
+def test_xml_encoding_declaration():
+    fields = pick_product_fields('<?xml version="1.0" encoding="utf-8"?><html><body><h1>Vysavač</h1></body></html>')
+
+    assert fields.title == 'Vysavač'